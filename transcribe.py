@@ -4,66 +4,312 @@ Deepgram Audio Transcription Tool
 Transcribes audio files to SRT or VTT subtitle formats using Deepgram's API.
 """
 
+import io
 import os
 import sys
 import json
 import time
+import mimetypes
+import asyncio
+import threading
+import functools
+import dataclasses
+from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
+import importlib.util
 from pathlib import Path
 from urllib.parse import urlparse
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, TYPE_CHECKING
 import re
 
 import click
-import requests
 from dotenv import load_dotenv
-from tqdm import tqdm
-from deepgram import DeepgramClient, PrerecordedOptions, FileSource
-import httpx
-import yt_dlp
+
+# The Deepgram SDK, httpx and yt-dlp are imported where they are used so that
+# --help and argument errors don't pay for loading them
+if TYPE_CHECKING:
+    from deepgram import PrerecordedOptions
+
+# orjson parses large word-level responses several times faster; it is optional
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
 # Load environment variables
 load_dotenv()
 
+# Bytes sent per WebSocket message when streaming a local file with --stream
+STREAM_CHUNK_SIZE = 8192
+
+# YouTube watch, short, embed, playlist, channel and handle URLs
+_YOUTUBE_RE = re.compile(
+    r'(?:https?://)?(?:www\.)?'
+    r'(?:youtu\.be/|youtube\.com/(?:watch\?v=|embed/|v/|playlist\?list=|channel/|c/|@))[\w-]+',
+    re.IGNORECASE
+)
+
+# Characters that are invalid in filenames on at least one platform, mapped to '_'
+_SANITIZE_TABLE = str.maketrans({char: '_' for char in '<>:"/\\|?*'})
+
+@functools.lru_cache(maxsize=128)
+def _is_url(path: str) -> bool:
+    """Check if the input is a URL, memoized because each source is checked several times."""
+    try:
+        result = urlparse(path)
+        return bool(result.scheme and result.netloc)
+    except ValueError:
+        return False
+
+
+class SourceKind(Enum):
+    """Kinds of audio source the transcriber accepts."""
+    YOUTUBE = 'youtube'
+    URL = 'url'
+    LOCAL = 'local'
+
+
+class DeepgramAPIError(ValueError):
+    """An error reply from Deepgram's REST API, carrying its HTTP status code."""
+    
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Deepgram API error ({status_code}): {message}")
+        self.status_code = status_code
+
+
+def _is_transient(error: Exception) -> bool:
+    """Tell whether a failed request is worth retrying: network failures, timeouts, rate limiting and server errors."""
+    import httpx
+    
+    if isinstance(error, DeepgramAPIError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, (httpx.TransportError, httpx.TimeoutException, TimeoutError, ConnectionError))
+
+
+@functools.lru_cache(maxsize=128)
+def _classify_source(audio_source: str) -> SourceKind:
+    """Classify an audio source once so later branches don't re-parse it."""
+    if _YOUTUBE_RE.match(audio_source):
+        return SourceKind.YOUTUBE
+    if _is_url(audio_source):
+        return SourceKind.URL
+    return SourceKind.LOCAL
+
+
+@functools.lru_cache(maxsize=32)
+def _replacement_pattern(find_terms: tuple) -> 're.Pattern':
+    """
+    Compile one alternation of the find terms, matching whole words only.
+    
+    Terms are tried longest first so a longer term wins over its prefix, and
+    the lookarounds keep a term from matching inside a longer word ('cat'
+    leaves 'category' alone).
+    """
+    alternation = '|'.join(map(re.escape, sorted(find_terms, key=len, reverse=True)))
+    return re.compile(rf'(?<!\w)(?:{alternation})(?!\w)')
+
+
+def _apply_replacements(text: str, replacements: dict) -> str:
+    """Apply all text replacements in a single scan of text."""
+    pattern = _replacement_pattern(tuple(replacements))
+    return pattern.sub(lambda match: replacements[match.group(0)], text)
+
+
+def _chunk_indices(starts, ends, char_lens, max_chars: int = 80, max_duration: float = 3.0):
+    """
+    Group word timings into subtitle cues.
+    
+    A cue ends once its space-joined text exceeds max_chars, once it spans
+    max_duration seconds, or at the last word. Returns parallel lists of the
+    first word index, last word index, start time and end time of each cue.
+    """
+    cue_first, cue_last, cue_starts, cue_ends = [], [], [], []
+    last_index = len(starts) - 1
+    first = 0
+    text_len = -1  # no separator before the first word of a cue
+    
+    for i in range(len(starts)):
+        text_len += char_lens[i] + 1
+        if text_len > max_chars or ends[i] - starts[first] >= max_duration or i == last_index:
+            cue_first.append(first)
+            cue_last.append(i)
+            cue_starts.append(starts[first])
+            cue_ends.append(ends[i])
+            first = i + 1
+            text_len = -1
+    
+    return cue_first, cue_last, cue_starts, cue_ends
+
+
+def _format_timestamps(times, separator: str) -> list:
+    """
+    Format a batch of offsets in seconds as HH:MM:SS<separator>mmm strings.
+    
+    Works on whole milliseconds with integer arithmetic, so there is no float
+    formatting or separator substitution per timestamp. round(seconds, 3)
+    rounds the exact decimal value like %.3f does; rounding seconds * 1000
+    directly would round the float product instead and be off by 1 ms for
+    values such as 0.0025.
+    """
+    timestamps = []
+    for seconds in times:
+        secs, millis = divmod(round(round(seconds, 3) * 1000), 1000)
+        minutes, secs = divmod(secs, 60)
+        hours, minutes = divmod(minutes, 60)
+        timestamps.append(f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}")
+    return timestamps
+
+
+def _match_speakers(speaker_map, cue_starts, cue_ends) -> list:
+    """
+    Pick the speaker label with the largest time overlap for each cue.
+    
+    Cues and speaker segments are both chronological, so segments ending
+    before the current cue are skipped for good and the scan for each cue
+    stops at the first segment starting after it. This keeps labelling
+    linear instead of comparing every cue with every segment.
+    """
+    segments = sorted(speaker_map.items(), key=lambda item: item[0][0])
+    cue_speakers = []
+    first_segment = 0
+    
+    for chunk_start, chunk_end in zip(cue_starts, cue_ends):
+        while first_segment < len(segments) and segments[first_segment][0][1] <= chunk_start:
+            first_segment += 1
+        
+        best_match_speaker = None
+        best_overlap = 0
+        for index in range(first_segment, len(segments)):
+            (speaker_start, speaker_end), speaker_label = segments[index]
+            if speaker_start >= chunk_end:
+                break
+            # Calculate overlap between chunk and speaker segment
+            overlap_duration = min(chunk_end, speaker_end) - max(chunk_start, speaker_start)
+            if overlap_duration > best_overlap:
+                best_overlap = overlap_duration
+                best_match_speaker = speaker_label
+        
+        cue_speakers.append(best_match_speaker)
+    
+    return cue_speakers
+
+
+@functools.lru_cache(maxsize=None)
+def _http_client():
+    """
+    Return the httpx client shared by every transcriber in the process.
+    
+    Retries, batch items and separate DeepgramTranscriber instances all reuse
+    its warm keep-alive connections. HTTP/2 is only enabled when the optional
+    h2 package is installed.
+    """
+    import httpx
+    
+    return httpx.Client(
+        http2=importlib.util.find_spec('h2') is not None,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=40)
+    )
+
+
+# YoutubeDL is not thread-safe, so each worker thread keeps its own instances for reuse
+_youtube_dl_instances = threading.local()
+
+
+def _youtube_dl(use_aria2c: bool):
+    """Return this thread's YoutubeDL for the chosen downloader, creating it on first use."""
+    instances = getattr(_youtube_dl_instances, 'by_downloader', None)
+    if instances is None:
+        instances = _youtube_dl_instances.by_downloader = {}
+    
+    if use_aria2c not in instances:
+        import yt_dlp
+        
+        # Deepgram accepts every container bestaudio resolves to (m4a, mp4, webm, opus),
+        # so the download is kept as-is rather than re-encoded with ffmpeg
+        ydl_opts = {
+            'format': 'bestaudio[ext=m4a]/bestaudio[ext=mp4]/bestaudio',
+            'quiet': True,
+            'no_warnings': True,
+            'http_chunk_size': 10 * 1024 * 1024,  # fetch in 10 MiB ranged requests
+            'outtmpl': '%(title)s.%(ext)s',  # saved under params['paths'], set per download
+            # Playlist, channel and @handle URLs only download their first video
+            'noplaylist': True,
+            'playlist_items': '1',
+            # Skip the watch page and client config fetches; the player API response is enough
+            'extractor_args': {'youtube': {'player_skip': ['webpage', 'configs']}},
+        }
+        if use_aria2c:
+            ydl_opts['external_downloader'] = {'default': 'aria2c'}
+            ydl_opts['external_downloader_args'] = {'aria2c': ['-x', '16', '-s', '16', '-k', '1M']}
+        instances[use_aria2c] = yt_dlp.YoutubeDL(ydl_opts)
+    
+    return instances[use_aria2c]
+
+
+def _first_video(info: Optional[dict]) -> Optional[dict]:
+    """Return the first video of a yt-dlp info dict, descending into (nested) playlists."""
+    while info is not None and 'entries' in info:
+        info = next((entry for entry in info['entries'] if entry), None)
+    return info
+
+
+def _advise_sequential(file) -> None:
+    """Ask the kernel for aggressive readahead so disk reads overlap the upload (POSIX only)."""
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass  # Readahead is only a hint
+
+
+def _prepare_output_path(output_file: str) -> Path:
+    """Create the output file's parent directories, returning its path."""
+    path = Path(output_file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
 class DeepgramTranscriber:
     """Handles Deepgram API transcription and subtitle generation."""
     
-    def __init__(self, api_key: str, timeout_seconds: int = 300):
+    supported_formats = frozenset({
+        'mp3', 'wav', 'flac', 'aac', 'm4a', 'ogg', 'opus', 'webm', 'mp4', 
+        'mov', 'avi', 'mkv', 'wmv', '3gp', 'amr', 'aiff', 'au', 'caf'
+    })
+    
+    def __init__(self, api_key: str, timeout_seconds: int = 300, max_retries: int = 3,
+                 verbose: bool = True, downloader: str = 'auto'):
+        import httpx
+        from deepgram import DeepgramClient
+        
         # Initialize client with standard constructor
         self.client = DeepgramClient(api_key)
         self.timeout_seconds = timeout_seconds
-        self.supported_formats = {
-            'mp3', 'wav', 'flac', 'aac', 'm4a', 'ogg', 'opus', 'webm', 'mp4', 
-            'mov', 'avi', 'mkv', 'wmv', '3gp', 'amr', 'aiff', 'au', 'caf'
-        }
+        self.max_retries = max_retries
+        self.verbose = verbose
+        self.downloader = downloader
+        
+        # Requests go through the process-wide connection pool, with this transcriber's timeout
+        self._http = _http_client()
+        self._timeout = httpx.Timeout(timeout_seconds, connect=10.0)
+    
+    def status(self, message: str):
+        """Print a progress message unless running quietly."""
+        if self.verbose:
+            click.echo(message)
     
     def is_url(self, path: str) -> bool:
         """Check if the input is a URL."""
-        try:
-            result = urlparse(path)
-            return all([result.scheme, result.netloc])
-        except:
-            return False
+        return _is_url(path)
     
     def is_youtube_url(self, url: str) -> bool:
         """Check if the URL is a YouTube URL."""
-        youtube_patterns = [
-            r'(?:https?://)?(?:www\.)?youtube\.com/watch\?v=[\w-]+',
-            r'(?:https?://)?(?:www\.)?youtu\.be/[\w-]+',
-            r'(?:https?://)?(?:www\.)?youtube\.com/embed/[\w-]+',
-            r'(?:https?://)?(?:www\.)?youtube\.com/v/[\w-]+',
-            r'(?:https?://)?(?:www\.)?youtube\.com/playlist\?list=[\w-]+',
-            r'(?:https?://)?(?:www\.)?youtube\.com/channel/[\w-]+',
-            r'(?:https?://)?(?:www\.)?youtube\.com/c/[\w-]+',
-            r'(?:https?://)?(?:www\.)?youtube\.com/@[\w-]+',
-        ]
-        return any(re.match(pattern, url, re.IGNORECASE) for pattern in youtube_patterns)
+        return _YOUTUBE_RE.match(url) is not None
     
     def sanitize_filename(self, filename: str) -> str:
         """Sanitize filename for cross-platform compatibility."""
-        # Remove or replace invalid characters
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            filename = filename.replace(char, '_')
+        # Replace invalid characters in a single pass
+        filename = filename.translate(_SANITIZE_TABLE)
         
         # Remove leading/trailing spaces and dots
         filename = filename.strip('. ')
@@ -82,6 +328,7 @@ class DeepgramTranscriber:
         """Extract direct audio stream URL from YouTube using yt-dlp."""
         import tempfile
         import os
+        import shutil
         
         # Choose output directory based on keep_audio flag
         if keep_audio:
@@ -89,48 +336,36 @@ class DeepgramTranscriber:
         else:
             output_dir = tempfile.mkdtemp()  # Temporary directory
         
-        ydl_opts = {
-            'format': 'bestaudio[ext=m4a]/bestaudio[ext=mp4]/bestaudio',
-            'quiet': True,
-            'no_warnings': True,
-            'extractaudio': True,
-            'audioformat': 'm4a',
-            'outtmpl': os.path.join(output_dir, '%(title)s.%(ext)s'),
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'm4a',
-                'preferredquality': '192',
-            }],
-        }
+        # Download over aria2c's parallel connections when it is installed (or requested)
+        use_aria2c = self.downloader == 'aria2c' or (self.downloader == 'auto' and shutil.which('aria2c') is not None)
+        ydl = _youtube_dl(use_aria2c)
+        ydl.params['paths'] = {'home': output_dir}
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            try:
-                # Download the audio
-                info = ydl.extract_info(youtube_url, download=True)
-                title = info.get('title', 'YouTube Video')
-                
-                # Find the downloaded file
-                downloaded_file = None
-                for file in os.listdir(output_dir):
-                    if file.endswith(('.m4a', '.mp4', '.webm', '.opus')):
-                        downloaded_file = os.path.join(output_dir, file)
-                        break
-                
-                if not downloaded_file:
-                    raise ValueError("No audio file was downloaded")
-                
-                return downloaded_file, title
-                
-            except Exception as e:
-                # Clean up temp directory on error only if not keeping audio
-                if not keep_audio:
-                    import shutil
-                    shutil.rmtree(output_dir, ignore_errors=True)
-                raise ValueError(f"Failed to extract YouTube audio: {str(e)}")
+        try:
+            # Download the audio
+            info = _first_video(ydl.extract_info(youtube_url, download=True))
+            if info is None:
+                raise ValueError("No videos found at this URL")
+            title = info.get('title', 'YouTube Video')
+            
+            # yt-dlp reports where it saved the file
+            downloaded_file = (info.get('requested_downloads') or [{}])[0].get('filepath') or ydl.prepare_filename(info)
+            
+            if not os.path.isfile(downloaded_file):
+                raise ValueError("No audio file was downloaded")
+            
+            return downloaded_file, title
+            
+        except Exception as e:
+            # Clean up temp directory on error only if not keeping audio
+            if not keep_audio:
+                shutil.rmtree(output_dir, ignore_errors=True)
+            raise ValueError(f"Failed to extract YouTube audio: {str(e)}")
     
-    def validate_audio_file(self, file_path: str) -> bool:
-        """Validate if the file format is supported by Deepgram."""
-        if self.is_url(file_path):
+    @classmethod
+    def validate_audio_file(cls, file_path: str) -> bool:
+        """Validate if the file format is supported by Deepgram (needs no instance, so no SDK import)."""
+        if _is_url(file_path):
             return True  # URLs (including YouTube) are valid, let Deepgram handle validation
         
         path = Path(file_path)
@@ -138,43 +373,61 @@ class DeepgramTranscriber:
             raise FileNotFoundError(f"File not found: {file_path}")
         
         extension = path.suffix.lower().lstrip('.')
-        if extension not in self.supported_formats:
-            raise ValueError(f"Unsupported format: {extension}. Supported formats: {', '.join(self.supported_formats)}")
+        if extension not in cls.supported_formats:
+            raise ValueError(f"Unsupported format: {extension}. Supported formats: {', '.join(cls.supported_formats)}")
         
         return True
     
     def transcribe_audio(self, audio_source: str, output_format: str = 'srt', 
                         enable_diarization: bool = False, text_replacements: dict = None, 
-                        keep_audio: bool = False, options: PrerecordedOptions = None) -> str:
+                        keep_audio: bool = False, options: 'PrerecordedOptions' = None,
+                        stream: bool = False, output_path: Optional[str] = None,
+                        pipe: bool = False, direct_url: bool = False,
+                        claim_output: Optional[Callable[[str], str]] = None,
+                        progress_bar: bool = True) -> str:
         """Transcribe audio from file or URL using Deepgram API."""
+        import httpx
+        from deepgram import PrerecordedOptions
         
         temp_file_to_cleanup = None
-        
-        # Reset debug flag for diarization
-        if hasattr(self, '_diarization_debug_printed'):
-            delattr(self, '_diarization_debug_printed')
+        youtube_info = None
         
         try:
+            kind = _classify_source(audio_source)
+            
             # Handle YouTube URLs
-            if self.is_youtube_url(audio_source):
-                click.echo("🎥 Extracting audio from YouTube video...")
-                audio_file_path, video_title = self.extract_youtube_audio_url(audio_source, keep_audio)
-                click.echo(f"📹 Video: {video_title}")
-                click.echo(f"🎵 Downloaded audio file: {Path(audio_file_path).name}")
-                if keep_audio:
-                    click.echo(f"💾 Audio file saved to: {audio_file_path}")
-                audio_source = audio_file_path
-                if not keep_audio:
-                    temp_file_to_cleanup = audio_file_path
+            if kind is SourceKind.YOUTUBE and (pipe or direct_url):
+                self.status("🎥 Extracting YouTube audio stream...")
+                youtube_info = _youtube_dl(False).extract_info(audio_source, download=False)
+                if ('entries' in youtube_info or 'format_id' not in youtube_info
+                        or (direct_url and 'url' not in youtube_info)):
+                    raise ValueError("--pipe and --direct-url need a single YouTube video URL, not a playlist or channel")
+                video_title = youtube_info.get('title', 'YouTube Video')
+                self.status(f"📹 Video: {video_title}")
+                output_filename = self.sanitize_filename(video_title)
+            elif kind is SourceKind.YOUTUBE:
+                audio_source, video_title, temp_file_to_cleanup = self._download_youtube_audio(audio_source, keep_audio)
+                kind = SourceKind.LOCAL
                 output_filename = self.sanitize_filename(video_title)
             else:
                 # For local files, use the filename without extension
-                output_filename = Path(audio_source).stem if not self.is_url(audio_source) else "transcription"
+                output_filename = Path(audio_source).stem if kind is SourceKind.LOCAL else "transcription"
             
             # Validate audio source
             if not self.validate_audio_file(audio_source):
                 raise ValueError(f"Unsupported audio format: {audio_source}")
             
+            # Pick the writer for the requested format
+            if output_format.lower() == 'srt':
+                write_subtitles = self.write_srt
+            elif output_format.lower() == 'vtt':
+                write_subtitles = self.write_vtt
+            else:
+                raise ValueError(f"Unsupported output format: {output_format}")
+            output_file = output_path or f"{output_filename}.{output_format.lower()}"
+            if claim_output is not None:
+                output_file = claim_output(output_file)
+            
             # Use provided options or create default ones
             if options is None:
                 options = PrerecordedOptions(
@@ -184,55 +437,60 @@ class DeepgramTranscriber:
                     diarize=enable_diarization,
                     language="en-US"
                 )
-            # Update diarization setting based on parameter
+            # Update diarization setting based on parameter, on a copy because build_options
+            # hands the same cached object to every caller
             if hasattr(options, 'diarize'):
-                options.diarize = enable_diarization
+                options = dataclasses.replace(options, diarize=enable_diarization)
+            
+            self.status("📤 Sending audio to Deepgram...")
             
-            # Create progress bar
-            with tqdm(total=100, desc="Transcribing", unit="%") as pbar:
-                pbar.update(10)
+            # Prepare the output location while the request is in flight
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                output_future = executor.submit(_prepare_output_path, output_file)
+                
+                response = None
+                if direct_url and youtube_info is not None:
+                    # Stream URLs are often tied to this machine's IP, so fall back when Deepgram can't fetch it
+                    try:
+                        response = self.transcribe_url_direct(youtube_info['url'], options)
+                    except (ValueError, httpx.HTTPError) as e:
+                        self.status(f"⚠️  Deepgram could not fetch the YouTube stream directly ({e}), falling back...")
+                        if not pipe:
+                            audio_source, _, temp_file_to_cleanup = self._download_youtube_audio(audio_source, keep_audio)
+                            kind = SourceKind.LOCAL
+                            youtube_info = None
                 
                 # Transcribe audio
-                if self.is_url(audio_source) and not temp_file_to_cleanup:
-                    response = self.client.listen.prerecorded.v("1").transcribe_url(
-                        {"url": audio_source}, options
-                    )
-                else:
-                    with open(audio_source, "rb") as audio_file:
-                        buffer_data = audio_file.read()
-                        response = self.client.listen.prerecorded.v("1").transcribe_file(
-                            {"buffer": buffer_data}, options
+                if response is None:
+                    if youtube_info is not None:
+                        response = self._with_retries(
+                            lambda: self.transcribe_youtube_pipe(youtube_info, options)
+                        )
+                    elif stream and kind is SourceKind.LOCAL:
+                        response = self._with_retries(
+                            lambda: asyncio.run(self.transcribe_stream(audio_source, options))
+                        )
+                    elif kind is SourceKind.URL:
+                        response = self._with_retries(
+                            lambda: self.transcribe_url_direct(audio_source, options)
+                        )
+                    else:
+                        response = self._with_retries(
+                            lambda: self.transcribe_file_direct(audio_source, options, progress_bar)
                         )
                 
-                pbar.update(90)
-                
-                # Extract transcript
-                transcript = response["results"]["channels"][0]["alternatives"][0]["transcript"]
-                if not transcript.strip():
-                    raise ValueError("No speech detected in the audio")
-                
-                # Apply text replacements if provided
-                if text_replacements:
-                    for old_text, new_text in text_replacements.items():
-                        transcript = transcript.replace(old_text, new_text)
-                
-                # Generate output based on format
-                if output_format.lower() == 'srt':
-                    output_content = self.generate_srt(response, enable_diarization)
-                    output_file = f"{output_filename}.srt"
-                elif output_format.lower() == 'vtt':
-                    output_content = self.generate_vtt(response, enable_diarization)
-                    output_file = f"{output_filename}.vtt"
-                else:
-                    raise ValueError(f"Unsupported output format: {output_format}")
-                
-                # Write output file
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    f.write(output_content)
-                
-                pbar.update(100)
-                
-                return output_file
+                output_file = output_future.result()
+            
+            self.status("📝 Writing subtitles...")
+            
+            if not response["results"]["channels"][0]["alternatives"][0]["transcript"].strip():
+                raise ValueError("No speech detected in the audio")
+            
+            # Write cues straight to the output file through a 64 KiB buffer instead of building the whole document first
+            with open(output_file, 'w', encoding='utf-8', buffering=65536) as f:
+                write_subtitles(response, f, enable_diarization, text_replacements)
+            
+            return str(output_file)
                 
         except Exception as e:
             raise ValueError(f"Transcription failed: {str(e)}")
@@ -247,54 +505,260 @@ class DeepgramTranscriber:
                 except Exception:
                     pass  # Ignore cleanup errors
     
+    def _download_youtube_audio(self, youtube_url: str, keep_audio: bool):
+        """Download a YouTube video's audio, returning its path, the video title and the file to clean up."""
+        self.status("🎥 Extracting audio from YouTube video...")
+        audio_file_path, video_title = self.extract_youtube_audio_url(youtube_url, keep_audio)
+        self.status(f"📹 Video: {video_title}")
+        self.status(f"🎵 Downloaded audio file: {Path(audio_file_path).name}")
+        if keep_audio:
+            self.status(f"💾 Audio file saved to: {audio_file_path}")
+        return audio_file_path, video_title, None if keep_audio else audio_file_path
+    
+    def _with_retries(self, request):
+        """Call request(), retrying transient failures up to max_retries times with exponential backoff."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return request()
+            except Exception as e:
+                if attempt == self.max_retries or not _is_transient(e):
+                    raise
+                delay = min(5 ** attempt, 15)  # 1s, 5s, then 15s between attempts
+                self.status(f"⚠️  Transient error ({e or type(e).__name__}), retrying in {delay}s ({attempt + 1}/{self.max_retries})...")
+                time.sleep(delay)
+    
+    def transcribe_file_direct(self, audio_path: str, options: 'PrerecordedOptions',
+                               progress_bar: bool = True) -> dict:
+        """
+        Upload a local file to Deepgram's REST API with httpx, bypassing the SDK.
+        
+        The open file is passed as the request body so it is sent straight from
+        disk in blocks, and the JSON reply is returned as a plain dict rather than
+        being converted into the SDK's response dataclasses.
+        """
+        headers = {'Content-Type': mimetypes.guess_type(audio_path)[0] or 'application/octet-stream'}
+        
+        with open(audio_path, "rb") as audio_file:
+            _advise_sequential(audio_file)
+            size = os.fstat(audio_file.fileno()).st_size
+            progress = self._upload_progress(size) if progress_bar else None
+            if progress is None:
+                return self._post_listen(options, headers, content=audio_file)
+            
+            # Feed the body through a generator to count bytes as they are sent; the explicit
+            # Content-Length keeps httpx from switching to a chunked upload
+            def chunks():
+                for block in iter(lambda: audio_file.read(65536), b''):
+                    progress.update(len(block))
+                    yield block
+            
+            headers['Content-Length'] = str(size)
+            with progress:
+                return self._post_listen(options, headers, content=chunks())
+    
+    def _upload_progress(self, total: int):
+        """Return a byte progress bar for an upload, or None when not on a terminal."""
+        if not (self.verbose and sys.stderr.isatty()):
+            return None
+        from tqdm import tqdm
+        
+        return tqdm(total=total, unit='B', unit_scale=True, unit_divisor=1024, desc="Uploading", leave=False)
+    
+    def transcribe_youtube_pipe(self, info: dict, options: 'PrerecordedOptions') -> dict:
+        """
+        Stream a YouTube video's audio from a yt-dlp subprocess straight into the upload.
+        
+        The download and upload overlap and the audio never touches the disk. The
+        already extracted info is handed to yt-dlp so the video is not extracted twice.
+        """
+        import subprocess
+        import tempfile
+        
+        with tempfile.NamedTemporaryFile('w', suffix='.info.json', delete=False) as info_file:
+            json.dump(_youtube_dl(False).sanitize_info(info), info_file)
+        
+        # stderr goes to a temporary file rather than a pipe nobody reads during the
+        # upload, which would stall yt-dlp once the pipe buffer filled up
+        stderr_file = tempfile.TemporaryFile()
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'yt_dlp', '--quiet', '--no-warnings',
+             '--load-info-json', info_file.name, '-f', info['format_id'], '-o', '-'],
+            stdout=subprocess.PIPE,
+            stderr=stderr_file
+        )
+        output_ended = False
+        
+        def chunks():
+            nonlocal output_ended
+            yield from iter(lambda: process.stdout.read(65536), b'')
+            output_ended = True
+        
+        def check_download():
+            if process.wait() != 0:
+                stderr_file.seek(0)
+                raise ValueError(f"yt-dlp failed: {stderr_file.read().decode(errors='replace').strip()}")
+        
+        try:
+            headers = {'Content-Type': mimetypes.guess_type(f"audio.{info.get('ext')}")[0] or 'application/octet-stream'}
+            # A generator, so httpx sends chunked instead of trusting the pipe's zero st_size
+            try:
+                response = self._post_listen(options, headers, content=chunks())
+            except Exception:
+                # A failed download cuts the body short and Deepgram rejects it; report
+                # yt-dlp's own error rather than Deepgram's
+                if output_ended:
+                    check_download()
+                raise
+            check_download()
+            return response
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            stderr_file.close()
+            os.unlink(info_file.name)
+    
+    def transcribe_url_direct(self, url: str, options: 'PrerecordedOptions') -> dict:
+        """Ask Deepgram to fetch and transcribe a remote URL, over the shared connection pool."""
+        return self._post_listen(options, {}, json={"url": url})
+    
+    def _post_listen(self, options: 'PrerecordedOptions', headers: dict, **request_kwargs) -> dict:
+        """POST a request to Deepgram's /v1/listen endpoint and return the JSON reply."""
+        response = self._http.post(
+            f"{self.client.config.url}/v1/listen",
+            params=options.to_dict(),
+            headers={**self.client.config.headers, **headers},
+            timeout=self._timeout,
+            **request_kwargs
+        )
+        
+        if response.is_error:
+            try:
+                message = response.json().get('err_msg') or response.text
+            except ValueError:
+                message = response.text
+            raise DeepgramAPIError(response.status_code, message)
+        
+        return _json_loads(response.content)
+    
+    async def transcribe_stream(self, audio_path: str, options: 'PrerecordedOptions') -> dict:
+        """Transcribe a local file over Deepgram's live WebSocket API so recognition overlaps the upload."""
+        from deepgram import LiveOptions, LiveTranscriptionEvents
+        
+        connection = self.client.listen.asynclive.v("1")
+        words = []
+        transcripts = []
+        errors = []
+        finished = asyncio.Event()
+        
+        async def on_transcript(client, result, **kwargs):
+            # Only final results carry settled word timings
+            if result.is_final:
+                alternative = result.channel.alternatives[0]
+                words.extend(word.to_dict() for word in alternative.words)
+                if alternative.transcript:
+                    transcripts.append(alternative.transcript)
+        
+        async def on_metadata(client, metadata, **kwargs):
+            # Deepgram sends metadata once every result for the stream has been flushed
+            finished.set()
+        
+        async def on_error(client, error=None, **kwargs):
+            errors.append(error)
+            finished.set()
+        
+        connection.on(LiveTranscriptionEvents.Transcript, on_transcript)
+        connection.on(LiveTranscriptionEvents.Metadata, on_metadata)
+        connection.on(LiveTranscriptionEvents.Error, on_error)
+        
+        # Prerecorded-only features (summaries, topics, ...) are dropped by LiveOptions
+        if not await connection.start(LiveOptions.from_dict(options.to_dict())):
+            raise ValueError("Could not open Deepgram streaming connection")
+        
+        try:
+            with open(audio_path, "rb") as audio_file:
+                _advise_sequential(audio_file)
+                while chunk := audio_file.read(STREAM_CHUNK_SIZE):
+                    await connection.send(chunk)
+                    await asyncio.sleep(0)
+            
+            # Ask Deepgram to flush the remaining results, then wait for them
+            await connection.send(json.dumps({"type": "CloseStream"}))
+            await asyncio.wait_for(finished.wait(), timeout=self.timeout_seconds)
+        finally:
+            await connection.finish()
+        
+        if errors:
+            raise ValueError(f"Streaming transcription failed: {errors[0]}")
+        
+        # Shape the collected words like a prerecorded response for the subtitle generators
+        return {
+            'results': {
+                'channels': [{
+                    'alternatives': [{
+                        'transcript': ' '.join(transcripts),
+                        'words': words
+                    }]
+                }]
+            }
+        }
+    
+    async def transcribe_many(self, audio_sources, max_concurrency: int = 4, **transcribe_kwargs) -> list:
+        """Transcribe several sources concurrently, returning output files or exceptions in input order."""
+        audio_sources = list(audio_sources)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        claimed_outputs = set()
+        claim_lock = threading.Lock()
+        
+        def claim_output(output_file: str) -> str:
+            """Reserve an output path for this batch, adding -2, -3, ... when sources share a name."""
+            path = Path(output_file)
+            candidate = path
+            suffix_number = 2
+            with claim_lock:
+                while candidate.resolve() in claimed_outputs:
+                    candidate = path.with_name(f"{path.stem}-{suffix_number}{path.suffix}")
+                    suffix_number += 1
+                claimed_outputs.add(candidate.resolve())
+            return str(candidate)
+        
+        async def transcribe_one(audio_source):
+            async with semaphore:
+                # The SDK's async client cannot stream a file handle, so each request
+                # runs the sync client on a worker thread and the event loop overlaps them
+                # Concurrent upload bars would redraw over each other and the other sources'
+                # status lines, so only a single source gets one
+                return await asyncio.to_thread(
+                    self.transcribe_audio, audio_source, claim_output=claim_output,
+                    progress_bar=len(audio_sources) == 1, **transcribe_kwargs
+                )
+        
+        return await asyncio.gather(
+            *(transcribe_one(audio_source) for audio_source in audio_sources),
+            return_exceptions=True
+        )
+    
     def format_timestamp(self, seconds: float, format_type: str) -> str:
         """Format timestamp for SRT or VTT format."""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = seconds % 60
-        
-        if format_type == 'srt':
-            return f"{hours:02d}:{minutes:02d}:{secs:06.3f}".replace('.', ',')
-        else:  # vtt
-            return f"{hours:02d}:{minutes:02d}:{secs:06.3f}"
+        separator = ',' if format_type == 'srt' else '.'
+        return _format_timestamps((seconds,), separator)[0]
     
-    def generate_srt(self, transcript_response, enable_diarization: bool = False) -> str:
-        """Generate SRT format subtitle content with optional speaker labels."""
-        srt_content = []
+    def _build_cues(self, transcript_response, enable_diarization: bool = False,
+                    text_replacements: Optional[dict] = None):
+        """
+        Build subtitle cues shared by the SRT and VTT generators.
         
-        # Convert response to dict for consistent handling
+        Returns parallel lists of cue start times, end times (in seconds) and
+        text, with text replacements applied and speaker labels prefixed when
+        diarization is enabled.
+        """
+        # Our own request paths return plain dicts; SDK response objects are converted once
         try:
-            if hasattr(transcript_response, 'to_dict'):
-                transcript_data = transcript_response.to_dict()
-            elif hasattr(transcript_response, 'results'):
-                # Handle nested object structure
-                results = transcript_response.results
-                if hasattr(results, 'to_dict'):
-                    transcript_data = {'results': results.to_dict()}
-                else:
-                    # Manual conversion for object attributes
-                    channels_data = []
-                    for channel in results.channels:
-                        alternatives_data = []
-                        for alt in channel.alternatives:
-                            alt_dict = {
-                                'transcript': alt.transcript if hasattr(alt, 'transcript') else '',
-                                'confidence': alt.confidence if hasattr(alt, 'confidence') else 0,
-                                'words': []
-                            }
-                            if hasattr(alt, 'words'):
-                                for word in alt.words:
-                                    alt_dict['words'].append({
-                                        'word': word.word,
-                                        'start': word.start,
-                                        'end': word.end,
-                                        'confidence': word.confidence if hasattr(word, 'confidence') else 0
-                                    })
-                            alternatives_data.append(alt_dict)
-                        channels_data.append({'alternatives': alternatives_data})
-                    transcript_data = {'results': {'channels': channels_data}}
-            else:
+            if isinstance(transcript_response, dict):
                 transcript_data = transcript_response
+            else:
+                transcript_data = transcript_response.to_dict()
             
             if not transcript_data.get('results', {}).get('channels', []):
                 raise ValueError("No transcription results found")
@@ -358,227 +822,204 @@ class DeepgramTranscriber:
                             speaker_map[(start_time, end_time)] = f"Speaker {speaker_id + 1}"
                             unique_speakers.add(speaker_id)
                     
-                    # Debug info (only print once for both SRT and VTT)
-                    if speaker_map and not hasattr(self, '_diarization_debug_printed'):
-                        print(f"🎙️  Detected {len(unique_speakers)} speakers with {len(speaker_map)} utterances")
-                        self._diarization_debug_printed = True
+                    # Debug info
+                    if speaker_map:
+                        self.status(f"🎙️  Detected {len(unique_speakers)} speakers with {len(speaker_map)} utterances")
                 else:
-                    if enable_diarization and not hasattr(self, '_diarization_debug_printed'):
-                        print("⚠️  Diarization enabled but no speaker information found in response")
-                        self._diarization_debug_printed = True
+                    if enable_diarization:
+                        self.status("⚠️  Diarization enabled but no speaker information found in response")
         except Exception as e:
             raise ValueError(f"Error processing transcript response: {str(e)}")
         
         if not words:
             # Fallback to paragraphs if words are not available
             paragraphs = alternatives.get('paragraphs', {}).get('paragraphs', [])
-            for i, paragraph in enumerate(paragraphs, 1):
-                start_time = self.format_timestamp(paragraph['start'], 'srt')
-                end_time = self.format_timestamp(paragraph['end'], 'srt')
-                text = paragraph['text'].strip()
-                
-                srt_content.append(f"{i}")
-                srt_content.append(f"{start_time} --> {end_time}")
-                srt_content.append(text)
-                srt_content.append("")
-        else:
-            # Group words into subtitle chunks (max ~80 chars per line)
-            chunk_duration = 3.0  # seconds per subtitle
-            current_chunk = []
-            chunk_start = None
-            subtitle_index = 1
-            
-            for word in words:
-                if chunk_start is None:
-                    chunk_start = word['start']
-                
-                current_chunk.append(word['word'])
-                
-                # Create subtitle when chunk is long enough or at natural breaks
-                chunk_text = ' '.join(current_chunk)
-                if (len(chunk_text) > 80 or 
-                    word['end'] - chunk_start >= chunk_duration or
-                    word == words[-1]):
-                    
-                    start_time = self.format_timestamp(chunk_start, 'srt')
-                    end_time = self.format_timestamp(word['end'], 'srt')
-                    
-                    # Add speaker label if diarization is enabled
-                    display_text = chunk_text
-                    if enable_diarization and speaker_map:
-                        # Find the speaker for this time range
-                        best_match_speaker = None
-                        best_overlap = 0
-                        
-                        for (speaker_start, speaker_end), speaker_label in speaker_map.items():
-                            # Calculate overlap between chunk and speaker segment
-                            overlap_start = max(chunk_start, speaker_start)
-                            overlap_end = min(word['end'], speaker_end)
-                            overlap_duration = max(0, overlap_end - overlap_start)
-                            
-                            if overlap_duration > best_overlap:
-                                best_overlap = overlap_duration
-                                best_match_speaker = speaker_label
-                        
-                        if best_match_speaker:
-                            display_text = f"[{best_match_speaker}] {chunk_text}"
-                    
-                    srt_content.append(f"{subtitle_index}")
-                    srt_content.append(f"{start_time} --> {end_time}")
-                    srt_content.append(display_text)
-                    srt_content.append("")
-                    
-                    subtitle_index += 1
-                    current_chunk = []
-                    chunk_start = None
+            cue_texts = [paragraph['text'].strip() for paragraph in paragraphs]
+            if text_replacements:
+                cue_texts = [_apply_replacements(text, text_replacements) for text in cue_texts]
+            return (
+                [paragraph['start'] for paragraph in paragraphs],
+                [paragraph['end'] for paragraph in paragraphs],
+                cue_texts
+            )
         
-        return '\n'.join(srt_content)
-    
-    def generate_vtt(self, transcript_response, enable_diarization: bool = False) -> str:
-        """Generate VTT format subtitle content with optional speaker labels."""
-        vtt_content = ["WEBVTT", ""]
+        # Group words into subtitle chunks (max ~80 chars per line)
+        chunk_duration = 3.0  # seconds per subtitle
+        tokens = [word['word'] for word in words]
+        cue_first, cue_last, cue_starts, cue_ends = _chunk_indices(
+            [word['start'] for word in words],
+            [word['end'] for word in words],
+            [len(token) for token in tokens],
+            max_chars=80, max_duration=chunk_duration
+        )
         
-        # Handle Deepgram SDK response object
-        if hasattr(transcript_response, 'results'):
-            transcript_data = transcript_response.results
+        # Add speaker labels if diarization is enabled
+        if enable_diarization and speaker_map:
+            cue_speakers = _match_speakers(speaker_map, cue_starts, cue_ends)
         else:
-            transcript_data = transcript_response
+            cue_speakers = [None] * len(cue_first)
         
-        if not transcript_data.get('channels', []):
-            raise ValueError("No transcription results found")
+        cue_texts = []
+        for first, last, speaker in zip(cue_first, cue_last, cue_speakers):
+            chunk_text = ' '.join(tokens[first:last + 1])
+            if text_replacements:
+                chunk_text = _apply_replacements(chunk_text, text_replacements)
+            cue_texts.append(f"[{speaker}] {chunk_text}" if speaker else chunk_text)
         
-        alternatives = transcript_data['channels'][0]['alternatives'][0]
-        words = alternatives.get('words', [])
+        return cue_starts, cue_ends, cue_texts
+    
+    def write_srt(self, transcript_response, output, enable_diarization: bool = False,
+                  text_replacements: Optional[dict] = None) -> None:
+        """Write SRT format subtitles with optional speaker labels to an open text file."""
+        cue_starts, cue_ends, cue_texts = self._build_cues(transcript_response, enable_diarization, text_replacements)
         
-        # Get speaker information if diarization is enabled
-        speaker_map = {}
-        if enable_diarization:
-            # Try different possible speaker info locations in the response
-            speaker_info = None
-            
-            # Check for utterances in alternatives
-            if 'utterances' in alternatives:
-                speaker_info = alternatives['utterances']
-            # Check for utterances at channel level
-            elif 'utterances' in transcript_data['channels'][0]:
-                speaker_info = transcript_data['channels'][0]['utterances']
-            # Check for words with speaker info
-            elif words and any('speaker' in word for word in words if isinstance(word, dict)):
-                # Create utterances from words with speaker info
-                current_speaker = None
-                current_start = None
-                current_end = None
-                speaker_info = []
-                
-                for word in words:
-                    if isinstance(word, dict) and 'speaker' in word:
-                        word_speaker = word['speaker']
-                        if current_speaker != word_speaker:
-                            # Save previous utterance
-                            if current_speaker is not None:
-                                speaker_info.append({
-                                    'speaker': current_speaker,
-                                    'start': current_start,
-                                    'end': current_end
-                                })
-                            # Start new utterance
-                            current_speaker = word_speaker
-                            current_start = word.get('start')
-                        current_end = word.get('end')
-                
-                # Add final utterance
-                if current_speaker is not None:
-                    speaker_info.append({
-                        'speaker': current_speaker,
-                        'start': current_start,
-                        'end': current_end
-                    })
-            
-            # Build speaker map
-            if speaker_info:
-                unique_speakers = set()
-                for utterance in speaker_info:
-                    speaker_id = utterance.get('speaker', 0)
-                    start_time = utterance.get('start')
-                    end_time = utterance.get('end')
-                    # Map time ranges to speakers
-                    if start_time is not None and end_time is not None:
-                        speaker_map[(start_time, end_time)] = f"Speaker {speaker_id + 1}"
-                        unique_speakers.add(speaker_id)
-                
-                # Debug info (only print once for both SRT and VTT)
-                if speaker_map and not hasattr(self, '_diarization_debug_printed'):
-                    print(f"🎙️  Detected {len(unique_speakers)} speakers with {len(speaker_map)} utterances")
-                    self._diarization_debug_printed = True
-            else:
-                if enable_diarization and not hasattr(self, '_diarization_debug_printed'):
-                    print("⚠️  Diarization enabled but no speaker information found in response")
-                    self._diarization_debug_printed = True
+        # Format every cue timestamp in one pass
+        start_times = _format_timestamps(cue_starts, ',')
+        end_times = _format_timestamps(cue_ends, ',')
         
-        if not words:
-            # Fallback to paragraphs if words are not available
-            paragraphs = alternatives.get('paragraphs', {}).get('paragraphs', [])
-            for paragraph in paragraphs:
-                start_time = self.format_timestamp(paragraph['start'], 'vtt')
-                end_time = self.format_timestamp(paragraph['end'], 'vtt')
-                text = paragraph['text'].strip()
-                
-                vtt_content.append(f"{start_time} --> {end_time}")
-                vtt_content.append(text)
-                vtt_content.append("")
-        else:
-            # Group words into subtitle chunks
-            chunk_duration = 3.0  # seconds per subtitle
-            current_chunk = []
-            chunk_start = None
-            
-            for word in words:
-                if chunk_start is None:
-                    chunk_start = word['start']
-                
-                current_chunk.append(word['word'])
-                
-                # Create subtitle when chunk is long enough or at natural breaks
-                chunk_text = ' '.join(current_chunk)
-                if (len(chunk_text) > 80 or 
-                    word['end'] - chunk_start >= chunk_duration or
-                    word == words[-1]):
-                    
-                    start_time = self.format_timestamp(chunk_start, 'vtt')
-                    end_time = self.format_timestamp(word['end'], 'vtt')
-                    
-                    # Add speaker label if diarization is enabled
-                    display_text = chunk_text
-                    if enable_diarization and speaker_map:
-                        # Find the speaker for this time range
-                        best_match_speaker = None
-                        best_overlap = 0
-                        
-                        for (speaker_start, speaker_end), speaker_label in speaker_map.items():
-                            # Calculate overlap between chunk and speaker segment
-                            overlap_start = max(chunk_start, speaker_start)
-                            overlap_end = min(word['end'], speaker_end)
-                            overlap_duration = max(0, overlap_end - overlap_start)
-                            
-                            if overlap_duration > best_overlap:
-                                best_overlap = overlap_duration
-                                best_match_speaker = speaker_label
-                        
-                        if best_match_speaker:
-                            display_text = f"[{best_match_speaker}] {chunk_text}"
-                    
-                    vtt_content.append(f"{start_time} --> {end_time}")
-                    vtt_content.append(display_text)
-                    vtt_content.append("")
-                    
-                    current_chunk = []
-                    chunk_start = None
+        # Cues are separated by a blank line
+        separator = ''
+        for subtitle_index, (start_time, end_time, text) in enumerate(zip(start_times, end_times, cue_texts), 1):
+            output.write(f"{separator}{subtitle_index}\n{start_time} --> {end_time}\n{text}\n")
+            separator = '\n'
+    
+    def write_vtt(self, transcript_response, output, enable_diarization: bool = False,
+                  text_replacements: Optional[dict] = None) -> None:
+        """Write VTT format subtitles with optional speaker labels to an open text file."""
+        cue_starts, cue_ends, cue_texts = self._build_cues(transcript_response, enable_diarization, text_replacements)
         
-        return '\n'.join(vtt_content)
+        # Format every cue timestamp in one pass
+        start_times = _format_timestamps(cue_starts, '.')
+        end_times = _format_timestamps(cue_ends, '.')
+        
+        output.write("WEBVTT\n")
+        for start_time, end_time, text in zip(start_times, end_times, cue_texts):
+            output.write(f"\n{start_time} --> {end_time}\n{text}\n")
+    
+    def generate_srt(self, transcript_response, enable_diarization: bool = False,
+                     text_replacements: Optional[dict] = None) -> str:
+        """Generate SRT format subtitle content with optional speaker labels."""
+        buffer = io.StringIO()
+        self.write_srt(transcript_response, buffer, enable_diarization, text_replacements)
+        return buffer.getvalue()
+    
+    def generate_vtt(self, transcript_response, enable_diarization: bool = False,
+                     text_replacements: Optional[dict] = None) -> str:
+        """Generate VTT format subtitle content with optional speaker labels."""
+        buffer = io.StringIO()
+        self.write_vtt(transcript_response, buffer, enable_diarization, text_replacements)
+        return buffer.getvalue()
+
+
+def _parse_replacements(pairs) -> dict:
+    """Parse --replace values of the form "find:replace" into a dict, skipping malformed ones."""
+    replacements = {}
+    for pair in pairs:
+        find_term, separator, replace_term = pair.partition(':')
+        # Without a separator or a find term there is nothing to replace
+        if separator and find_term:
+            replacements[find_term] = replace_term
+    return replacements
+
+
+@functools.lru_cache(maxsize=64)
+def build_options(frozen_kwargs: frozenset) -> 'PrerecordedOptions':
+    """
+    Build Deepgram request options from the CLI arguments.
+    
+    Takes the arguments as a frozenset of (name, value) pairs so that batches
+    and repeated invocations with identical arguments share one options object.
+    """
+    kwargs = dict(frozen_kwargs)
+    
+    # Prepare transcription options
+    options_dict = {
+        'punctuate': kwargs.get('punctuate', True),
+        'paragraphs': kwargs.get('paragraphs', True),
+        'smart_format': kwargs.get('smart_format', True),
+    }
+    
+    # Add language (with fallback to env default)
+    language = kwargs.get('language') or os.getenv('DEFAULT_LANGUAGE', 'en')
+    options_dict['language'] = language
+    
+    # Add model (with fallback to env default)
+    model = kwargs.get('model') or os.getenv('DEFAULT_MODEL', 'nova-2')
+    options_dict['model'] = model
+    
+    # Add optional features
+    if kwargs.get('diarize'):
+        options_dict['diarize'] = True
+    
+    if kwargs.get('profanity_filter'):
+        options_dict['profanity_filter'] = True
+    
+    if kwargs.get('redact'):
+        options_dict['redact'] = list(kwargs['redact'])
+    
+    if kwargs.get('summarize'):
+        options_dict['summarize'] = True
+    
+    if kwargs.get('detect_topics'):
+        options_dict['detect_topics'] = True
+    
+    if kwargs.get('detect_entities'):
+        options_dict['detect_entities'] = True
+    
+    if kwargs.get('utterances'):
+        options_dict['utterances'] = True
+    
+    if kwargs.get('keywords'):
+        options_dict['keywords'] = list(kwargs['keywords'])
+    
+    if kwargs.get('search'):
+        options_dict['search'] = list(kwargs['search'])
+    
+    # --replace is applied locally to the subtitle text (see _build_cues), not sent to
+    # Deepgram, so each rule runs exactly once; like Deepgram, it matches whole words only
+    
+    if kwargs.get('numerals'):
+        options_dict['numerals'] = True
+    
+    if kwargs.get('measurements'):
+        options_dict['measurements'] = True
+    
+    if kwargs.get('multichannel'):
+        options_dict['multichannel'] = True
+    
+    alternatives = kwargs.get('alternatives', 1)
+    if alternatives > 1:
+        options_dict['alternatives'] = alternatives
+    
+    # Add technical audio parameters if specified
+    if kwargs.get('encoding'):
+        options_dict['encoding'] = kwargs['encoding']
+    
+    if kwargs.get('sample_rate'):
+        options_dict['sample_rate'] = kwargs['sample_rate']
+    
+    if kwargs.get('channels'):
+        options_dict['channels'] = kwargs['channels']
+    
+    if kwargs.get('tier'):
+        options_dict['tier'] = kwargs['tier']
+    
+    if kwargs.get('version'):
+        options_dict['version'] = kwargs['version']
+    
+    if kwargs.get('endpointing') is not None:
+        options_dict['endpointing'] = kwargs['endpointing']
+    
+    if kwargs.get('vad_turnoff') is not None:
+        options_dict['vad_turnoff'] = kwargs['vad_turnoff']
+    
+    # Create PrerecordedOptions object
+    from deepgram import PrerecordedOptions
+    return PrerecordedOptions(**options_dict)
 
 
 @click.command()
-@click.argument('audio_source', type=str)
+@click.argument('audio_sources', type=str, nargs=-1, required=True)
 @click.option('--format', 'output_format', type=click.Choice(['srt', 'vtt']), 
               default='srt', help='Output subtitle format (default: srt)')
 @click.option('--output', '-o', type=str, help='Output file path (default: same as input with new extension)')
@@ -624,6 +1065,8 @@ class DeepgramTranscriber:
               help='Deepgram tier (nova, enhanced, base)')
 @click.option('--version', type=str,
               help='Model version')
+@click.option('--stream/--no-stream', default=False,
+              help='Stream local files over the live WebSocket API so transcription overlaps the upload')
 @click.option('--interim-results/--no-interim-results', default=False,
               help='Enable interim results for streaming (not applicable for prerecorded)')
 @click.option('--endpointing', type=int,
@@ -642,12 +1085,22 @@ class DeepgramTranscriber:
               help='Number of retry attempts for failed requests (default: 3)')
 @click.option('--chunk-size', default=100, help='File chunk size in MB for large files (default: 100)')
 @click.option('--keep-audio', is_flag=True, help='Keep downloaded YouTube audio file instead of deleting it')
+@click.option('--direct-url/--no-direct-url', default=False,
+              help='Let Deepgram fetch the YouTube audio stream itself, downloading only if that fails')
+@click.option('--pipe/--no-pipe', default=False,
+              help='Pipe YouTube audio from yt-dlp straight into the upload instead of saving it first')
+@click.option('--downloader', type=click.Choice(['auto', 'native', 'aria2c']), default='auto',
+              help='Downloader for YouTube audio; auto uses aria2c when it is installed (default: auto)')
+@click.option('--concurrency', type=int, default=4,
+              help='Maximum number of sources transcribed at the same time (default: 4)')
+@click.option('--verbose/--quiet', default=True,
+              help='Show progress messages while transcribing (default: enabled)')
 @click.option('--help', is_flag=True, expose_value=False, is_eager=True, help='Show this message and exit.')
-def transcribe_command(audio_source, **kwargs):
+def transcribe_command(audio_sources, **kwargs):
     """
     Transcribe audio files, URLs, or YouTube videos to SRT/VTT subtitle formats using Deepgram API.
     
-    AUDIO_SOURCE can be:
+    AUDIO_SOURCES is one or more of the following, transcribed concurrently:
     - Local file path (audio.mp3, video.mp4, etc.)
     - Direct URL to audio/video file
     - YouTube URL (https://youtube.com/watch?v=..., https://youtu.be/...)
@@ -668,6 +1121,9 @@ def transcribe_command(audio_source, **kwargs):
     
     Full feature YouTube example:
         python transcribe.py "https://youtu.be/dQw4w9WgXcQ" --diarize --summarize --detect-topics --punctuate --smart-format
+    
+    Batch transcription:
+        python transcribe.py intro.mp3 interview.wav outro.mp3 --concurrency 3
     """
     
     # Get API key
@@ -677,136 +1133,71 @@ def transcribe_command(audio_source, **kwargs):
         click.echo("Please add your API key to the .env file.", err=True)
         sys.exit(1)
     
-    # Initialize transcriber with custom timeout
-    timeout_seconds = kwargs.get('timeout', 300)
-    transcriber = DeepgramTranscriber(api_key, timeout_seconds)
-    
     try:
-        # Validate audio source
-        click.echo(f"Validating audio source: {audio_source}")
-        transcriber.validate_audio_file(audio_source)
-        
-        # Prepare transcription options
-        options_dict = {
-            'punctuate': kwargs.get('punctuate', True),
-            'paragraphs': kwargs.get('paragraphs', True),
-            'smart_format': kwargs.get('smart_format', True),
-        }
-        
-        # Add language (with fallback to env default)
-        language = kwargs.get('language') or os.getenv('DEFAULT_LANGUAGE', 'en')
-        options_dict['language'] = language
-        
-        # Add model (with fallback to env default)
-        model = kwargs.get('model') or os.getenv('DEFAULT_MODEL', 'nova-2')
-        options_dict['model'] = model
-        
-        # Add optional features
-        if kwargs.get('diarize'):
-            options_dict['diarize'] = True
-        
-        if kwargs.get('profanity_filter'):
-            options_dict['profanity_filter'] = True
-        
-        if kwargs.get('redact'):
-            options_dict['redact'] = list(kwargs['redact'])
-        
-        if kwargs.get('summarize'):
-            options_dict['summarize'] = True
-        
-        if kwargs.get('detect_topics'):
-            options_dict['detect_topics'] = True
-        
-        if kwargs.get('detect_entities'):
-            options_dict['detect_entities'] = True
+        if kwargs.get('output') and len(audio_sources) > 1:
+            raise ValueError("--output can only be used with a single audio source")
         
-        if kwargs.get('utterances'):
-            options_dict['utterances'] = True
+        # Validate audio sources before the transcriber imports the Deepgram SDK
+        for audio_source in audio_sources:
+            if kwargs.get('verbose', True):
+                click.echo(f"Validating audio source: {audio_source}")
+            DeepgramTranscriber.validate_audio_file(audio_source)
         
-        if kwargs.get('keywords'):
-            options_dict['keywords'] = list(kwargs['keywords'])
-        
-        if kwargs.get('search'):
-            options_dict['search'] = list(kwargs['search'])
-        
-        if kwargs.get('replace'):
-            replace_dict = {}
-            for replace_pair in kwargs['replace']:
-                if ':' in replace_pair:
-                    find_term, replace_term = replace_pair.split(':', 1)
-                    replace_dict[find_term] = replace_term
-            if replace_dict:
-                options_dict['replace'] = replace_dict
-        
-        if kwargs.get('numerals'):
-            options_dict['numerals'] = True
-        
-        if kwargs.get('measurements'):
-            options_dict['measurements'] = True
-        
-        if kwargs.get('multichannel'):
-            options_dict['multichannel'] = True
-        
-        alternatives = kwargs.get('alternatives', 1)
-        if alternatives > 1:
-            options_dict['alternatives'] = alternatives
-        
-        # Add technical audio parameters if specified
-        if kwargs.get('encoding'):
-            options_dict['encoding'] = kwargs['encoding']
-        
-        if kwargs.get('sample_rate'):
-            options_dict['sample_rate'] = kwargs['sample_rate']
-        
-        if kwargs.get('channels'):
-            options_dict['channels'] = kwargs['channels']
-        
-        if kwargs.get('tier'):
-            options_dict['tier'] = kwargs['tier']
+        # Initialize transcriber with custom timeout and retry budget
+        timeout_seconds = kwargs.get('timeout', 300)
+        max_retries = kwargs.get('retries', 3)
+        transcriber = DeepgramTranscriber(api_key, timeout_seconds, max_retries,
+                                          verbose=kwargs.get('verbose', True),
+                                          downloader=kwargs.get('downloader', 'auto'))
         
-        if kwargs.get('version'):
-            options_dict['version'] = kwargs['version']
+        # Prepare transcription options (built once per distinct set of arguments)
+        options = build_options(frozenset(
+            (key, value) for key, value in kwargs.items() if value not in (None, ())
+        ))
         
-        if kwargs.get('endpointing') is not None:
-            options_dict['endpointing'] = kwargs['endpointing']
+        # Perform transcription
+        transcriber.status("Starting transcription...")
         
-        if kwargs.get('vad_turnoff') is not None:
-            options_dict['vad_turnoff'] = kwargs['vad_turnoff']
+        # Prepare text replacements
+        text_replacements = _parse_replacements(kwargs.get('replace', ()))
         
-        # Create PrerecordedOptions object
-        options = PrerecordedOptions(**options_dict)
+        # Transcribe all sources concurrently with the same parameters
+        results = asyncio.run(transcriber.transcribe_many(
+            audio_sources,
+            max_concurrency=kwargs.get('concurrency', 4),
+            output_format=kwargs.get('output_format', 'srt'),
+            enable_diarization=kwargs.get('diarize', False),
+            text_replacements=text_replacements if text_replacements else None,
+            keep_audio=kwargs.get('keep_audio', False),
+            options=options,
+            stream=kwargs.get('stream', False),
+            output_path=kwargs.get('output'),
+            pipe=kwargs.get('pipe', False),
+            direct_url=kwargs.get('direct_url', False)
+        ))
         
-        # Perform transcription with progress indicator
-        click.echo("Starting transcription...")
-        max_retries = kwargs.get('retries', 3)
+        output_files = []
+        failures = []
+        for audio_source, result in zip(audio_sources, results):
+            if isinstance(result, Exception):
+                failures.append((audio_source, result))
+            else:
+                output_files.append(result)
         
-        with tqdm(total=100, desc="Transcribing", unit="%") as pbar:
-            pbar.update(10)  # Initial progress
-            
-            # Prepare text replacements
-            text_replacements = {}
-            if kwargs.get('replace'):
-                for replacement in kwargs['replace']:
-                    if ':' in replacement:
-                        old_text, new_text = replacement.split(':', 1)
-                        text_replacements[old_text] = new_text
-            
-            # Call transcribe_audio with correct parameters
-            output_file = transcriber.transcribe_audio(
-                audio_source,
-                output_format=kwargs.get('format', 'srt'),
-                enable_diarization=kwargs.get('diarize', False),
-                text_replacements=text_replacements if text_replacements else None,
-                keep_audio=kwargs.get('keep_audio', False),
-                options=options
-            )
-            pbar.update(10)  # Complete
+        if len(audio_sources) == 1 and failures:
+            raise failures[0][1]
         
         # Success message
-        click.echo(f"✅ Transcription completed successfully!")
-        click.echo(f"📄 Output file: {output_file}")
+        if output_files:
+            click.echo(f"✅ Transcription completed successfully!")
+        for output_file in output_files:
+            click.echo(f"📄 Output file: {output_file}")
+        for audio_source, error in failures:
+            click.echo(f"❌ Error ({audio_source}): {str(error)}")
+        if failures:
+            sys.exit(1)
         
-        return output_file
+        return output_files
     
     except Exception as e:
         click.echo(f"❌ Error: {str(e)}")